@@ -6,7 +6,7 @@ from .models import UploadedDataset
 @admin.register(UploadedDataset)
 class UploadedDatasetAdmin(admin.ModelAdmin):
     list_display = ('id', 'uploaded_at', 'file_name', 'download_pdf')
-    readonly_fields = ('uploaded_at', 'summary')
+    readonly_fields = ('uploaded_at', 'summary', 'quality')
 
     def file_name(self, obj):
         return obj.file.name
@@ -0,0 +1,63 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_KEY = 'datasets:generation'
+HITS_KEY = 'datasets:hits'
+MISSES_KEY = 'datasets:misses'
+
+
+def _cache():
+    return caches[getattr(settings, 'DATASET_CACHE_ALIAS', 'default')]
+
+
+def generation():
+    """
+    Token that every cached dataset response is keyed under. Invalidation replaces it, so stale
+    entries are never read again and simply expire; a random token (rather than a counter) means
+    concurrent invalidations from different workers cannot collide on the same value.
+    """
+    cache = _cache()
+    token = cache.get(GENERATION_KEY)
+    if token is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        token = cache.get(GENERATION_KEY)
+    return token
+
+
+def invalidate():
+    _cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _count(key):
+    # get + set rather than incr(): backends without a native incr (the file backend among them)
+    # re-set the key with the default timeout, which would expire the counters. A lost update
+    # under concurrent requests only makes the statistics approximate.
+    cache = _cache()
+    cache.set(key, cache.get(key, 0) + 1, None)
+
+
+def get_or_build(request, build):
+    """
+    Returns (data, hit) for the request's absolute URL, calling build() on a miss.
+    The generation is read before build() runs, so a response computed from pre-invalidation
+    data is stored under the old generation and never served afterwards.
+    """
+    cache = _cache()
+    key = f'datasets:{generation()}:{request.build_absolute_uri()}'
+    data = cache.get(key)
+    if data is not None:
+        _count(HITS_KEY)
+        return data, True
+    _count(MISSES_KEY)
+    data = build()
+    cache.set(key, data, getattr(settings, 'DATASET_CACHE_TIMEOUT', 300))
+    return data, False
+
+
+def stats():
+    cache = _cache()
+    hits, misses = cache.get(HITS_KEY, 0), cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': round(hits / total, 4) if total else None}
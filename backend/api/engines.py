@@ -0,0 +1,167 @@
+import csv
+import io
+import os
+
+import pandas as pd
+from django.conf import settings
+
+try:
+    import pyarrow
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pyarrow = None
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+TEXT_COLUMNS = ['Equipment Name', 'Type']
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, columns):
+        self.columns = columns
+        super().__init__(f"CSV is missing required columns: {', '.join(columns)}")
+
+
+class ParseEngine:
+    """
+    Turns an equipment CSV file object into a DataFrame with stripped headers and numeric
+    parameter columns (unparseable values become 0). Raises MissingColumnsError when a required
+    column is missing.
+    """
+    name = None
+
+    def read(self, fileobj):
+        df, _ = self.load(fileobj)
+        return fill_missing(df)
+
+    def load(self, fileobj):
+        """
+        Like read() but leaves missing and unparseable parameter values as NaN, and also returns
+        how many non-empty values per column could not be parsed as numbers.
+        """
+        return self._clean(self.parse(fileobj))
+
+    def iter_chunks(self, fileobj, chunksize):
+        """
+        Yields the file as cleaned DataFrames of bounded size, as read() would return them,
+        without materialising the whole file.
+        """
+        for chunk in self.parse_chunks(fileobj, chunksize):
+            df, _ = self._clean(chunk)
+            yield fill_missing(df)
+
+    def _clean(self, df):
+        df.columns = df.columns.str.strip()
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise MissingColumnsError(missing)
+        coerced = {}
+        for col in NUMERIC_COLUMNS:
+            if pd.api.types.is_float_dtype(df[col]):
+                coerced[col] = 0
+                continue
+            numeric = pd.to_numeric(df[col], errors='coerce')
+            coerced[col] = int((numeric.isna() & df[col].notna()).sum())
+            df[col] = numeric
+        return df, coerced
+
+    def parse(self, fileobj):
+        raise NotImplementedError
+
+    def parse_chunks(self, fileobj, chunksize):
+        raise NotImplementedError
+
+
+class PandasEngine(ParseEngine):
+    name = 'pandas'
+
+    def parse(self, fileobj):
+        return pd.read_csv(fileobj)
+
+    def parse_chunks(self, fileobj, chunksize):
+        return pd.read_csv(fileobj, chunksize=chunksize)
+
+
+class PyArrowEngine(ParseEngine):
+    """
+    Multithreaded pyarrow reader that types the parameter columns while parsing. Files with
+    non-numeric parameter values fall back to reading those columns as text and coercing afterwards.
+    """
+    name = 'pyarrow'
+    block_size = 16 * 1024 * 1024
+
+    def parse(self, fileobj):
+        header = self._header(fileobj)
+        raw = {name.strip(): name for name in header}
+        text_types = {raw[col]: pyarrow.string() for col in TEXT_COLUMNS if col in raw}
+        numeric_types = {raw[col]: pyarrow.float64() for col in NUMERIC_COLUMNS if col in raw}
+        try:
+            table = self._read(fileobj, {**text_types, **numeric_types})
+        except pyarrow.ArrowInvalid:
+            table = self._read(fileobj, {**text_types, **{name: pyarrow.string() for name in numeric_types}})
+        return table.to_pandas()
+
+    def parse_chunks(self, fileobj, chunksize):
+        # Parameter columns are read as text here: a bad value in a later block cannot be
+        # retried once earlier blocks have been yielded, so coercion happens per chunk instead.
+        # Other columns are skipped, as their types would be inferred from the first block only.
+        header = self._header(fileobj)
+        raw = {name.strip(): name for name in header}
+        missing = [col for col in REQUIRED_COLUMNS if col not in raw]
+        if missing:
+            raise MissingColumnsError(missing)
+        column_names = [raw[col] for col in REQUIRED_COLUMNS]
+        reader = pa_csv.open_csv(
+            fileobj,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=self.block_size),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pyarrow.string() for name in column_names},
+                include_columns=column_names, strings_can_be_null=True,
+            ),
+        )
+        for batch in reader:
+            df = batch.to_pandas()
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize].copy()
+
+    def _header(self, fileobj):
+        fileobj.seek(0)
+        line = fileobj.readline()
+        fileobj.seek(0)
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig')
+        return next(csv.reader(io.StringIO(line)), [])
+
+    def _read(self, fileobj, column_types):
+        fileobj.seek(0)
+        return pa_csv.read_csv(
+            fileobj,
+            read_options=pa_csv.ReadOptions(use_threads=True, block_size=self.block_size),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+        )
+
+
+def fill_missing(df):
+    for col in NUMERIC_COLUMNS:
+        df[col] = df[col].fillna(0)
+    return df
+
+
+ENGINES = {engine.name: engine for engine in (PandasEngine, PyArrowEngine)}
+
+
+def select_engine(size=None, name=None):
+    """
+    Picks a parse engine. CSV_PARSE_ENGINE forces one; 'auto' uses pyarrow for files of at least
+    CSV_PYARROW_MIN_BYTES when it is installed and more than one core is available.
+    """
+    name = name or getattr(settings, 'CSV_PARSE_ENGINE', 'auto')
+    if name == 'auto':
+        min_bytes = getattr(settings, 'CSV_PYARROW_MIN_BYTES', 32 * 1024 * 1024)
+        use_arrow = pyarrow is not None and (os.cpu_count() or 1) > 1 and size is not None and size >= min_bytes
+        name = 'pyarrow' if use_arrow else 'pandas'
+    if name not in ENGINES:
+        raise ValueError(f"Unknown CSV parse engine: {name}")
+    if name == 'pyarrow' and pyarrow is None:
+        raise ValueError("CSV parse engine 'pyarrow' requires the pyarrow package")
+    return ENGINES[name]()
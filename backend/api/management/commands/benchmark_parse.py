@@ -0,0 +1,47 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.engines import ENGINES, pyarrow, select_engine
+from api.metrics import summarize, type_metrics
+from api.management.commands.benchmark_pdf import synthetic_csv
+
+CHUNK_ROWS = 1_000_000
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the CSV parse engines on a synthetic file and checks that their summaries match.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000_000)
+        parser.add_argument('--engines', nargs='+', default=list(ENGINES))
+
+    def handle(self, *args, **options):
+        engines = [name for name in options['engines'] if name != 'pyarrow' or pyarrow is not None]
+        with tempfile.NamedTemporaryFile(suffix='.csv') as tmp:
+            rows = options['rows']
+            for start in range(0, rows, CHUNK_ROWS):
+                content = synthetic_csv(min(CHUNK_ROWS, rows - start), seed=start)
+                if start:
+                    content = content.split(b'\n', 1)[1]
+                tmp.write(content)
+            tmp.flush()
+            size = os.path.getsize(tmp.name)
+            self.stdout.write(f"{rows} rows, {size / 1e9:.2f} GB, {os.cpu_count()} cores")
+
+            timings, summaries = {}, {}
+            for name in engines:
+                start = time.perf_counter()
+                with open(tmp.name, 'rb') as f:
+                    df = select_engine(name=name).read(f)
+                summaries[name] = (summarize(df), type_metrics(df))
+                timings[name] = time.perf_counter() - start
+                del df
+                self.stdout.write(f"{name:>8}: {timings[name]:7.2f}s  {size / 1e6 / timings[name]:7.1f} MB/s")
+
+        baseline = engines[0]
+        for name in engines[1:]:
+            match = 'match' if summaries[name] == summaries[baseline] else 'DIFFER'
+            self.stdout.write(f"{name} vs {baseline}: {timings[baseline] / timings[name]:.2f}x, summaries {match}")
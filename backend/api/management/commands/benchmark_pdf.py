@@ -0,0 +1,64 @@
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from api.models import UploadedDataset
+from api.utils import generate_detailed_pdf_report
+
+EQUIPMENT_TYPES = ['Pump', 'Valve', 'Compressor', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+def synthetic_csv(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Equipment Name': [f'EQ-{i:07d}' for i in range(rows)],
+        'Type': rng.choice(EQUIPMENT_TYPES, size=rows),
+        'Flowrate': rng.normal(120, 25, rows).round(2),
+        'Pressure': rng.normal(5, 1.2, rows).round(2),
+        'Temperature': rng.normal(110, 30, rows).round(2),
+    })
+    return df.to_csv(index=False).encode()
+
+
+def _render(dataset, results):
+    # Runs in a forked child so ru_maxrss reflects this report alone.
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    output = generate_detailed_pdf_report(dataset)
+    elapsed = time.perf_counter() - start
+    output.seek(0, 2)
+    size = output.tell()
+    output.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, size, baseline, peak))
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks detailed PDF generation time and peak memory on synthetic datasets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+
+    def handle(self, *args, **options):
+        ctx = multiprocessing.get_context('fork')
+        self.stdout.write(f"{'rows':>10} {'seconds':>9} {'rows/s':>9} {'pdf MB':>8} {'base RSS MB':>12} {'peak RSS MB':>12}")
+        for rows in options['sizes']:
+            dataset = UploadedDataset(file=ContentFile(synthetic_csv(rows), name=f'bench_{rows}.csv'))
+            dataset.save()
+            try:
+                results = ctx.Queue()
+                child = ctx.Process(target=_render, args=(dataset, results))
+                child.start()
+                elapsed, size, baseline, peak = results.get()
+                child.join()
+                self.stdout.write(
+                    f"{rows:>10} {elapsed:>9.2f} {rows / elapsed:>9.0f} {size / 1e6:>8.2f} "
+                    f"{baseline / 1024:>12.1f} {peak / 1024:>12.1f}"
+                )
+            finally:
+                dataset.delete()
@@ -0,0 +1,74 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+
+from api.management.commands.benchmark_pdf import synthetic_csv
+from api.models import UploadedDataset
+from api.rendering import RenderPool, RenderPoolSaturated
+from api.utils import generate_pdf_report
+
+
+class Command(BaseCommand):
+    help = 'Compares inline and pooled PDF rendering throughput under concurrent requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=60)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--rows', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        dataset = UploadedDataset(file=ContentFile(synthetic_csv(options['rows']), name='bench_render.csv'))
+        dataset.save()
+        try:
+            # pyplot is not thread-safe, so inline rendering in one process is serialised
+            # just like requests handled by a single synchronous web worker.
+            lock = threading.Lock()
+
+            def inline():
+                with lock:
+                    generate_pdf_report(dataset).close()
+
+            self._run('inline', inline, options)
+
+            # Client threads stand in for the request threads of one gthread web worker; like
+            # clients honouring Retry-After, they back off and retry while the pool is busy.
+            pool = RenderPool(options['workers'])
+            try:
+                def pooled():
+                    while True:
+                        try:
+                            os.remove(pool.render(dataset, None, timeout=60))
+                            return
+                        except RenderPoolSaturated:
+                            time.sleep(0.01)
+
+                self._run(f"pooled x{options['workers']}", pooled, options)
+            finally:
+                pool.shutdown()
+        finally:
+            dataset.delete()
+
+    def _run(self, label, render, options):
+        latencies = []
+
+        def timed(_):
+            start = time.perf_counter()
+            render()
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as clients:
+            list(clients.map(timed, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        self.stdout.write(
+            f"{label:>12}: {options['requests'] / elapsed:6.1f} reports/s  "
+            f"p50 {statistics.median(latencies) * 1000:6.0f} ms  "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:6.0f} ms"
+        )
@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api import cache
+from api.engines import MissingColumnsError
+from api.metrics import SUMMARY_VERSION, read_and_profile, summarize, type_metrics, write_metrics
+from api.models import DatasetMetrics, DatasetTypeMetrics, UploadedDataset
+
+
+def _resummarize(task):
+    # Runs in a pool worker: parse only, the parent process does all database writes.
+    pk, path = task
+    try:
+        with open(path, 'rb') as f:
+            df, report = read_and_profile(f, size=os.path.getsize(path))
+        return pk, summarize(df), report, type_metrics(df), None
+    except MissingColumnsError as e:
+        # Recorded the way UploadedDataset.save() records it, not a failure: re-reading won't fix it.
+        return pk, None, {'missing_columns': e.columns}, None, None
+    except Exception as e:
+        return pk, None, None, None, str(e)
+
+
+def _date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise CommandError(f"Invalid date: {value}")
+    return timezone.make_aware(datetime.combine(parsed, datetime.min.time()))
+
+
+class Command(BaseCommand):
+    help = 'Recomputes dataset summaries, quality reports and metric tables from the stored CSV files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help='Only these dataset ids.')
+        parser.add_argument('--since', help='Only datasets uploaded on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--until', help='Only datasets uploaded before this date (YYYY-MM-DD).')
+        parser.add_argument('--outdated', action='store_true',
+                            help=f'Only datasets whose summary version is below {SUMMARY_VERSION}.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--checkpoint',
+                            help='File recording the last committed id; an interrupted run resumes after it.')
+        parser.add_argument('--dry-run', action='store_true', help='Parse and report, but write nothing.')
+
+    def handle(self, *args, **options):
+        queryset = UploadedDataset.objects.exclude(file='')
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['since']:
+            queryset = queryset.filter(uploaded_at__gte=_date(options['since']))
+        if options['until']:
+            queryset = queryset.filter(uploaded_at__lt=_date(options['until']))
+        if options['outdated']:
+            queryset = queryset.filter(
+                Q(summary__isnull=True) | Q(summary__version__isnull=True) | Q(summary__version__lt=SUMMARY_VERSION)
+            )
+
+        checkpoint = options['checkpoint']
+        resume_after = 0
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                resume_after = int(f.read().strip() or 0)
+            queryset = queryset.filter(pk__gt=resume_after)
+            self.stdout.write(f"Resuming after dataset #{resume_after}")
+
+        pending = list(queryset.order_by('pk').values_list('pk', 'file'))
+        if not pending:
+            self.stdout.write("Nothing to resummarize.")
+            return
+
+        batch_size = max(options['batch_size'], 1)
+        workers = max(options['workers'], 1)
+        self.stdout.write(f"Resummarizing {len(pending)} datasets with {workers} workers"
+                          + (" (dry run)" if options['dry_run'] else ""))
+
+        start = time.perf_counter()
+        done = changed = parsed_bytes = 0
+        failed_ids = []
+        # Highest id up to which every dataset succeeded; the checkpoint never moves past a failure.
+        committed_through = resume_after
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            for offset in range(0, len(pending), batch_size):
+                tasks = []
+                for pk, name in pending[offset:offset + batch_size]:
+                    path = UploadedDataset.file.field.storage.path(name)
+                    if os.path.isfile(path):
+                        parsed_bytes += os.path.getsize(path)
+                    tasks.append((pk, path))
+                results = list(pool.map(_resummarize, tasks))
+
+                c, batch_failures = self._write_batch(results, options['dry_run'])
+                changed, done = changed + c, done + len(results)
+                for pk, *_ in results:
+                    if pk in batch_failures or failed_ids:
+                        break
+                    committed_through = pk
+                failed_ids += batch_failures
+                if checkpoint and not options['dry_run']:
+                    with open(checkpoint, 'w') as fh:
+                        fh.write(str(committed_through))
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"  {done}/{len(pending)} datasets, {changed} changed, {len(failed_ids)} failed, "
+                    f"{done / elapsed:.1f} datasets/s, {parsed_bytes / 1e6 / elapsed:.1f} MB/s"
+                )
+
+        if checkpoint and not failed_ids and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would update' if options['dry_run'] else 'Updated'} {changed} of {done} datasets "
+            f"in {time.perf_counter() - start:.1f}s ({len(failed_ids)} failed)"
+        ))
+        if failed_ids:
+            self.stdout.write(self.style.WARNING(
+                f"Failed datasets (re-run with --ids): {' '.join(str(pk) for pk in failed_ids)}"
+            ))
+
+    def _write_batch(self, results, dry_run):
+        """
+        Writes the changed summaries of one batch; returns (changed count, failed ids).
+        """
+        failed = []
+        updates = {}
+        for pk, summary, report, type_rows, error in results:
+            if error:
+                failed.append(pk)
+                self.stderr.write(f"  dataset #{pk}: {error}")
+            else:
+                updates[pk] = (summary, report, type_rows)
+
+        datasets = list(UploadedDataset.objects.filter(pk__in=updates).only('pk', 'uploaded_at', 'summary', 'quality'))
+        datasets = [d for d in datasets if (d.summary, d.quality) != updates[d.pk][:2]]
+        if dry_run or not datasets:
+            return len(datasets), failed
+
+        with transaction.atomic():
+            for dataset in datasets:
+                dataset.summary, dataset.quality = updates[dataset.pk][:2]
+            UploadedDataset.objects.bulk_update(datasets, ['summary', 'quality'])
+            for dataset in datasets:
+                type_rows = updates[dataset.pk][2]
+                if type_rows is None:
+                    DatasetMetrics.objects.filter(dataset_id=dataset.pk).delete()
+                    DatasetTypeMetrics.objects.filter(dataset_id=dataset.pk).delete()
+                else:
+                    write_metrics(DatasetMetrics, DatasetTypeMetrics, dataset, type_rows)
+            # bulk_update sends no post_save, so invalidate cached responses explicitly.
+            transaction.on_commit(cache.invalidate)
+        return len(datasets), failed
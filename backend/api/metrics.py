@@ -0,0 +1,118 @@
+from . import quality
+from .engines import NUMERIC_COLUMNS, fill_missing, select_engine
+
+# Bump whenever summarize() or the quality profile changes so `manage.py resummarize --outdated`
+# picks up old summaries.
+SUMMARY_VERSION = 3
+
+
+def read_and_profile(fileobj, size=None, engine=None):
+    """
+    Parses an equipment CSV with the configured (or given) parse engine and returns it together
+    with the data-quality report built from the same parse. Raises MissingColumnsError when a
+    required column is missing.
+    """
+    df, coerced = select_engine(size=size, name=engine).load(fileobj)
+    report = quality.profile(df, coerced)
+    return fill_missing(df), report
+
+
+def aggregate(df):
+    """
+    Running aggregates (counts and parameter sums, overall and per Type) that the summary is
+    derived from. They are additive, so appended rows can be folded in with merge_aggregates().
+    """
+    grouped = df.groupby('Type')[NUMERIC_COLUMNS]
+    type_sums = grouped.sum()
+    type_counts = grouped.size()
+    return {
+        "count": len(df),
+        "sums": {col: float(df[col].sum()) for col in NUMERIC_COLUMNS},
+        "types": {
+            str(type_name): {
+                "count": int(type_counts[type_name]),
+                "sums": {col: float(type_sums.at[type_name, col]) for col in NUMERIC_COLUMNS},
+            }
+            for type_name in type_counts.index
+        },
+    }
+
+
+def merge_aggregates(left, right):
+    types = {name: {"count": t["count"], "sums": dict(t["sums"])} for name, t in left["types"].items()}
+    for name, t in right["types"].items():
+        if name in types:
+            types[name]["count"] += t["count"]
+            for col in NUMERIC_COLUMNS:
+                types[name]["sums"][col] += t["sums"][col]
+        else:
+            types[name] = {"count": t["count"], "sums": dict(t["sums"])}
+    return {
+        "count": left["count"] + right["count"],
+        "sums": {col: left["sums"][col] + right["sums"][col] for col in NUMERIC_COLUMNS},
+        "types": types,
+    }
+
+
+def _mean(total, count):
+    return round(total / count, 2) if count else 0
+
+
+def summary_from_aggregates(agg):
+    types = sorted(agg["types"].items(), key=lambda item: item[1]["count"], reverse=True)
+    return {
+        "version": SUMMARY_VERSION,
+        "total_count": agg["count"],
+        "averages": {col: _mean(agg["sums"][col], agg["count"]) for col in NUMERIC_COLUMNS},
+        "type_distribution": {name: t["count"] for name, t in types},
+        "aggregates": agg,
+    }
+
+
+def summarize(df):
+    return summary_from_aggregates(aggregate(df))
+
+
+def type_metrics_from_aggregates(agg):
+    """
+    Per-Type row counts and parameter averages, one dict per equipment type.
+    """
+    return [
+        {
+            'equipment_type': name,
+            'count': t['count'],
+            'avg_flowrate': _mean(t['sums']['Flowrate'], t['count']),
+            'avg_pressure': _mean(t['sums']['Pressure'], t['count']),
+            'avg_temperature': _mean(t['sums']['Temperature'], t['count']),
+        }
+        for name, t in agg['types'].items()
+    ]
+
+
+def type_metrics(df):
+    return type_metrics_from_aggregates(aggregate(df))
+
+
+def write_metrics(dataset_metrics_model, type_metrics_model, dataset, type_rows):
+    """
+    Replaces the denormalised metric rows of one dataset. The model classes are passed in because
+    api.models imports this module.
+    """
+    summary = dataset.summary or {}
+    averages = summary.get('averages', {})
+    dataset_metrics_model.objects.update_or_create(
+        dataset_id=dataset.pk,
+        defaults={
+            'uploaded_at': dataset.uploaded_at,
+            'total_count': summary.get('total_count', 0),
+            'type_count': len(type_rows),
+            'avg_flowrate': averages.get('Flowrate'),
+            'avg_pressure': averages.get('Pressure'),
+            'avg_temperature': averages.get('Temperature'),
+        },
+    )
+    type_metrics_model.objects.filter(dataset_id=dataset.pk).delete()
+    type_metrics_model.objects.bulk_create([
+        type_metrics_model(dataset_id=dataset.pk, uploaded_at=dataset.uploaded_at, **row)
+        for row in type_rows
+    ])
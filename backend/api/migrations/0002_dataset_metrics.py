@@ -0,0 +1,46 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetMetrics',
+            fields=[
+                ('dataset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='api.uploadeddataset')),
+                ('uploaded_at', models.DateTimeField(db_index=True)),
+                ('total_count', models.PositiveIntegerField()),
+                ('type_count', models.PositiveIntegerField()),
+                ('avg_flowrate', models.FloatField(null=True)),
+                ('avg_pressure', models.FloatField(null=True)),
+                ('avg_temperature', models.FloatField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['avg_flowrate'], name='api_dataset_avg_flo_7fe17d_idx'), models.Index(fields=['avg_pressure'], name='api_dataset_avg_pre_6cfbb2_idx'), models.Index(fields=['avg_temperature'], name='api_dataset_avg_tem_cbfe5e_idx'), models.Index(fields=['total_count'], name='api_dataset_total_c_c790d3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DatasetTypeMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uploaded_at', models.DateTimeField()),
+                ('equipment_type', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField()),
+                ('avg_flowrate', models.FloatField(null=True)),
+                ('avg_pressure', models.FloatField(null=True)),
+                ('avg_temperature', models.FloatField(null=True)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='type_metrics', to='api.uploadeddataset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['equipment_type', 'uploaded_at'], name='api_dataset_equipme_bd4250_idx'), models.Index(fields=['equipment_type', 'avg_flowrate'], name='api_dataset_equipme_ebf4c9_idx'), models.Index(fields=['equipment_type', 'avg_pressure'], name='api_dataset_equipme_b556a9_idx'), models.Index(fields=['equipment_type', 'avg_temperature'], name='api_dataset_equipme_e9cb4c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dataset', 'equipment_type'), name='unique_dataset_type_metrics')],
+            },
+        ),
+    ]
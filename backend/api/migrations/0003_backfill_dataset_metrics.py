@@ -0,0 +1,98 @@
+import pandas as pd
+from django.db import migrations, transaction
+
+# The backfill logic is frozen here on purpose: later changes to the app's parsing and metric
+# code must not change what this migration does.
+BATCH_SIZE = 100
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+def _type_rows_from_file(dataset):
+    with dataset.file.open('rb') as f:
+        df = pd.read_csv(f)
+    df.columns = df.columns.str.strip()
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return None
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    grouped = df.groupby('Type')[NUMERIC_COLUMNS]
+    means = grouped.mean().round(2)
+    counts = grouped.size()
+    return [
+        {
+            'equipment_type': str(type_name),
+            'count': int(counts[type_name]),
+            'avg_flowrate': float(means.at[type_name, 'Flowrate']),
+            'avg_pressure': float(means.at[type_name, 'Pressure']),
+            'avg_temperature': float(means.at[type_name, 'Temperature']),
+        }
+        for type_name in counts.index
+    ]
+
+
+def _type_rows_from_summary(summary):
+    # The source file is gone: counts are known, per-type averages are not.
+    return [
+        {'equipment_type': str(type_name), 'count': int(count),
+         'avg_flowrate': None, 'avg_pressure': None, 'avg_temperature': None}
+        for type_name, count in summary.get('type_distribution', {}).items()
+    ]
+
+
+def _write(DatasetMetrics, DatasetTypeMetrics, dataset, type_rows):
+    averages = dataset.summary.get('averages', {})
+    DatasetMetrics.objects.update_or_create(
+        dataset_id=dataset.pk,
+        defaults={
+            'uploaded_at': dataset.uploaded_at,
+            'total_count': dataset.summary.get('total_count', 0),
+            'type_count': len(type_rows),
+            'avg_flowrate': averages.get('Flowrate'),
+            'avg_pressure': averages.get('Pressure'),
+            'avg_temperature': averages.get('Temperature'),
+        },
+    )
+    DatasetTypeMetrics.objects.filter(dataset_id=dataset.pk).delete()
+    DatasetTypeMetrics.objects.bulk_create([
+        DatasetTypeMetrics(dataset_id=dataset.pk, uploaded_at=dataset.uploaded_at, **row)
+        for row in type_rows
+    ])
+
+
+def backfill(apps, schema_editor, batch_size=BATCH_SIZE):
+    UploadedDataset = apps.get_model('api', 'UploadedDataset')
+    DatasetMetrics = apps.get_model('api', 'DatasetMetrics')
+    DatasetTypeMetrics = apps.get_model('api', 'DatasetTypeMetrics')
+
+    last_pk = 0
+    while True:
+        batch = list(
+            UploadedDataset.objects.filter(pk__gt=last_pk, summary__isnull=False).order_by('pk')[:batch_size]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            for dataset in batch:
+                type_rows = None
+                try:
+                    type_rows = _type_rows_from_file(dataset)
+                except Exception as e:
+                    print(f"Could not re-read dataset {dataset.pk} for metrics backfill: {e}")
+                if type_rows is None:
+                    type_rows = _type_rows_from_summary(dataset.summary)
+                _write(DatasetMetrics, DatasetTypeMetrics, dataset, type_rows)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so a large backfill can be interrupted and re-run.
+    atomic = False
+
+    dependencies = [
+        ('api', '0002_dataset_metrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_backfill_dataset_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadeddataset',
+            name='quality',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,37 +1,160 @@
-from django.db import models
-import pandas as pd
+from django.db import models, transaction
+import csv
+import io
+import logging
 import os
+import shutil
+
+from . import quality
+from .engines import MissingColumnsError
+from .metrics import (
+    aggregate, merge_aggregates, read_and_profile, summarize, summary_from_aggregates,
+    type_metrics, type_metrics_from_aggregates, write_metrics,
+)
+
+logger = logging.getLogger(__name__)
 
 class UploadedDataset(models.Model):
     file = models.FileField(upload_to='datasets/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
     summary = models.JSONField(blank=True, null=True)
+    quality = models.JSONField(blank=True, null=True)
 
     def save(self, *args, **kwargs):
+        type_rows = None
         if self.file and not self.summary:
             try:
                 self.file.open()
-                df = pd.read_csv(self.file)
-                df.columns = df.columns.str.strip()
-                required_cols = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-                if all(col in df.columns for col in required_cols):
-                    for col in ['Flowrate', 'Pressure', 'Temperature']:
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                    self.summary = {
-                        "total_count": len(df),
-                        "averages": {
-                            "Flowrate": round(df['Flowrate'].mean(), 2),
-                            "Pressure": round(df['Pressure'].mean(), 2),
-                            "Temperature": round(df['Temperature'].mean(), 2),
-                        },
-                        "type_distribution": df['Type'].value_counts().to_dict()
-                    }
+                df, self.quality = read_and_profile(self.file, size=self.file.size)
+                self.summary = summarize(df)
+                type_rows = type_metrics(df)
+            except MissingColumnsError as e:
+                self.quality = {'missing_columns': e.columns}
             except Exception as e:
-                print(f"Error parsing CSV in model: {e}")
+                logger.warning("Could not parse uploaded CSV %s: %s", self.file.name, e)
+                self.quality = {'parse_error': str(e)}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if type_rows is not None:
+                write_metrics(DatasetMetrics, DatasetTypeMetrics, self, type_rows)
+
+    def append(self, fileobj, size=None):
+        """
+        Appends the rows of another equipment CSV to this dataset. Only the new rows are parsed;
+        they are folded into the running aggregates stored in the summary.
+        """
+        delta, delta_quality = read_and_profile(fileobj, size=size)
+
+        with transaction.atomic():
+            current = UploadedDataset.objects.select_for_update().get(pk=self.pk)
+            agg = (current.summary or {}).get('aggregates')
+            base_quality = current.quality
+            if agg is None or base_quality is None:
+                # Datasets saved before running aggregates or quality reports existed need one
+                # full read of the stored rows to seed whichever is missing.
+                current.file.open('rb')
+                try:
+                    base, profiled = read_and_profile(current.file, size=current.file.size)
+                except MissingColumnsError:
+                    raise ValueError("Existing dataset has no summary to append to")
+                finally:
+                    current.file.close()
+                if agg is None:
+                    agg = aggregate(base)
+                if base_quality is None:
+                    base_quality = profiled
+            agg = merge_aggregates(agg, aggregate(delta))
+
+            self.summary = summary_from_aggregates(agg)
+            self.quality = quality.merge(base_quality, delta_quality)
+            self.save(update_fields=['summary', 'quality'])
+            write_metrics(DatasetMetrics, DatasetTypeMetrics, self, type_metrics_from_aggregates(agg))
+            self._append_rows_to_file(fileobj)
+
+    def _append_rows_to_file(self, fileobj):
+        """
+        Appends the uploaded rows exactly as sent. Only when the upload's columns differ from the
+        stored header are the raw cells re-ordered; parsed/cleaned values are never written back.
+        """
+        path = self.file.path
+        with open(path, 'rb') as f:
+            stored_header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+            f.seek(0, os.SEEK_END)
+            needs_newline = False
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) not in (b'\n', b'\r')
 
-        super().save(*args, **kwargs)
+        fileobj.seek(0)
+        upload_header = next(csv.reader([fileobj.readline().decode('utf-8-sig')]))
+        stored_names = [name.strip() for name in stored_header]
+        upload_names = [name.strip() for name in upload_header]
+
+        with open(path, 'ab') as out:
+            if needs_newline:
+                out.write(b'\n')
+            if upload_names == stored_names:
+                shutil.copyfileobj(fileobj, out)
+                return
+            positions = [upload_names.index(name) if name in upload_names else None for name in stored_names]
+            source = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+            target = io.TextIOWrapper(out, encoding='utf-8', newline='')
+            writer = csv.writer(target, lineterminator='\n')
+            for row in csv.reader(source):
+                writer.writerow([row[i] if i is not None and i < len(row) else '' for i in positions])
+            target.flush()
+            # Detach so the wrappers do not close the upload or the stored file when collected.
+            target.detach()
+            source.detach()
 
     def delete(self, *args, **kwargs):
         if self.file and os.path.isfile(self.file.path):
             os.remove(self.file.path)
         super().delete(*args, **kwargs)
+
+
+class DatasetMetrics(models.Model):
+    """
+    Queryable copy of a dataset's summary, written at ingest time.
+    """
+    dataset = models.OneToOneField(UploadedDataset, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='metrics')
+    uploaded_at = models.DateTimeField(db_index=True)
+    total_count = models.PositiveIntegerField()
+    type_count = models.PositiveIntegerField()
+    avg_flowrate = models.FloatField(null=True)
+    avg_pressure = models.FloatField(null=True)
+    avg_temperature = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['avg_flowrate']),
+            models.Index(fields=['avg_pressure']),
+            models.Index(fields=['avg_temperature']),
+            models.Index(fields=['total_count']),
+        ]
+
+
+class DatasetTypeMetrics(models.Model):
+    """
+    Count and parameter averages for one equipment Type within one dataset.
+    """
+    dataset = models.ForeignKey(UploadedDataset, on_delete=models.CASCADE, related_name='type_metrics')
+    uploaded_at = models.DateTimeField()
+    equipment_type = models.CharField(max_length=255)
+    count = models.PositiveIntegerField()
+    avg_flowrate = models.FloatField(null=True)
+    avg_pressure = models.FloatField(null=True)
+    avg_temperature = models.FloatField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dataset', 'equipment_type'], name='unique_dataset_type_metrics'),
+        ]
+        indexes = [
+            models.Index(fields=['equipment_type', 'uploaded_at']),
+            models.Index(fields=['equipment_type', 'avg_flowrate']),
+            models.Index(fields=['equipment_type', 'avg_pressure']),
+            models.Index(fields=['equipment_type', 'avg_temperature']),
+        ]
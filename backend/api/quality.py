@@ -0,0 +1,108 @@
+import numpy as np
+from django.conf import settings
+
+DEFAULT_THRESHOLDS = {
+    # Inclusive (min, max) plausibility bounds per parameter; None leaves a side open.
+    'ranges': {
+        'Flowrate': [0, None],
+        'Pressure': [0, None],
+        'Temperature': [-273.15, None],
+    },
+    'iqr_multiplier': 1.5,
+    'zscore': 3.0,
+    # Types with fewer valid values than this are too small for meaningful outlier statistics.
+    'min_group_size': 8,
+    'max_examples': 10,
+}
+
+
+def thresholds():
+    configured = getattr(settings, 'DATA_QUALITY_THRESHOLDS', {})
+    merged = {**DEFAULT_THRESHOLDS, **configured}
+    merged['ranges'] = {**DEFAULT_THRESHOLDS['ranges'], **configured.get('ranges', {})}
+    return merged
+
+
+def profile(df, coerced):
+    """
+    Builds the quality report from the parsed frame before missing values are filled, so it adds
+    no extra pass over the file. `coerced` maps each numeric column to its count of non-empty
+    values that failed to parse; those are NaN in df alongside the genuinely missing ones.
+    """
+    limits = thresholds()
+    types = df['Type']
+    valid_types = types.notna()
+    report = {
+        'rows': len(df),
+        'columns': {},
+        'outliers_by_type': {},
+        'missing_type': int((~valid_types).sum()),
+    }
+
+    for col in coerced:
+        values = df[col]
+        low, high = limits['ranges'].get(col, [None, None])
+        out_of_range = np.zeros(len(df), dtype=bool)
+        if low is not None:
+            out_of_range |= (values < low).to_numpy()
+        if high is not None:
+            out_of_range |= (values > high).to_numpy()
+
+        grouped = values.groupby(types)
+        sizes = grouped.transform('count')
+        eligible = (sizes >= limits['min_group_size']).to_numpy() & valid_types.to_numpy()
+
+        q1 = grouped.transform('quantile', 0.25)
+        q3 = grouped.transform('quantile', 0.75)
+        spread = (q3 - q1) * limits['iqr_multiplier']
+        iqr = ((values < q1 - spread) | (values > q3 + spread)).to_numpy() & eligible
+
+        std = grouped.transform('std')
+        z = ((values - grouped.transform('mean')) / std.where(std > 0)).abs()
+        zscore = (z > limits['zscore']).to_numpy() & eligible
+
+        report['columns'][col] = {
+            'missing': int(values.isna().sum()) - coerced[col],
+            'coerced': coerced[col],
+            'out_of_range': int(out_of_range.sum()),
+            'iqr_outliers': int(iqr.sum()),
+            'zscore_outliers': int(zscore.sum()),
+        }
+        if iqr.any():
+            for type_name, count in types[iqr].value_counts().items():
+                report['outliers_by_type'].setdefault(str(type_name), {})[col] = int(count)
+
+    names = df['Equipment Name']
+    duplicated = names.notna() & names.duplicated(keep=False)
+    report['duplicate_names'] = {
+        'rows': int(duplicated.sum()),
+        'examples': [str(name) for name in names[duplicated].unique()[:limits['max_examples']]],
+    }
+    return report
+
+
+def merge(left, right):
+    """
+    Folds the report of appended rows into an existing one. Counters add up exactly; outliers and
+    duplicate names in the appended rows are judged against those rows only, hence 'incremental'.
+    """
+    columns = {}
+    for col in set(left['columns']) | set(right['columns']):
+        a, b = left['columns'].get(col, {}), right['columns'].get(col, {})
+        columns[col] = {key: a.get(key, 0) + b.get(key, 0) for key in set(a) | set(b)}
+    outliers = {name: dict(cols) for name, cols in left['outliers_by_type'].items()}
+    for name, cols in right['outliers_by_type'].items():
+        for col, count in cols.items():
+            outliers.setdefault(name, {})[col] = outliers.get(name, {}).get(col, 0) + count
+    examples = left['duplicate_names']['examples'] + right['duplicate_names']['examples']
+    return {
+        'rows': left['rows'] + right['rows'],
+        'columns': columns,
+        'outliers_by_type': outliers,
+        'missing_type': left['missing_type'] + right['missing_type'],
+        'duplicate_names': {
+            'rows': left['duplicate_names']['rows'] + right['duplicate_names']['rows'],
+            'examples': list(dict.fromkeys(examples))[:thresholds()['max_examples']],
+        },
+        'incremental': True,
+    }
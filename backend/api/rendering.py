@@ -0,0 +1,290 @@
+import fcntl
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import tempfile
+import threading
+from multiprocessing.connection import Connection
+
+from django.conf import settings
+from reportlab.pdfgen import canvas
+
+from .utils import generate_chart, generate_detailed_pdf_report, generate_pdf_report
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPoolSaturated(Exception):
+    pass
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class RenderFailed(Exception):
+    pass
+
+
+def warm_up():
+    """
+    Renders a throwaway chart and PDF so matplotlib's font cache and ReportLab's font metrics
+    are loaded. The pool calls this before starting its spawner, so every worker starts warm.
+    """
+    generate_chart({'type_distribution': {'Pump': 1}}).close()
+    c = canvas.Canvas(io.BytesIO())
+    for font in ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique'):
+        c.setFont(font, 12)
+        c.drawString(0, 0, 'warm-up')
+    c.save()
+
+
+def _serve(conn):
+    # Render worker main loop: one (dataset, mode, path) job at a time until the pipe closes.
+    while True:
+        try:
+            dataset, mode, path = conn.recv()
+        except EOFError:
+            return
+        try:
+            with open(path, 'wb') as out:
+                if mode == 'detailed':
+                    generate_detailed_pdf_report(dataset, output=out)
+                else:
+                    generate_pdf_report(dataset, output=out)
+            conn.send(None)
+        except Exception as e:
+            conn.send(repr(e))
+
+
+def _spawn_workers(control, parent_control):
+    # Spawner main loop: forks one render worker per byte received and hands the parent its pid
+    # and pipe end. Forking from here keeps the threaded web process from ever forking itself.
+    # Without the parent's end of the control socket, the loop ends (and the workers see EOF on
+    # their pipes) once the web process exits. Slot descriptors are dropped for the same reason:
+    # this process would otherwise keep their flock()s.
+    parent_control.close()
+    for fd in list(_slot_fds):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    # Handlers inherited from the web server (gunicorn's graceful-exit ones) would keep
+    # multiprocessing from stopping this process when the web process exits.
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT, signal.SIGUSR1, signal.SIGWINCH):
+        signal.signal(signum, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    control.sendall(b'!')
+    while control.recv(1):
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            control.close()
+            parent_end.close()
+            try:
+                _serve(Connection(child_end.detach()))
+            finally:
+                os._exit(0)
+        child_end.close()
+        socket.send_fds(control, [pid.to_bytes(4, 'little')], [parent_end.fileno()])
+        parent_end.close()
+
+
+class _Spawner:
+    def __init__(self, ctx):
+        self.control, child_end = socket.socketpair()
+        self.process = ctx.Process(target=_spawn_workers, args=(child_end, self.control), daemon=True)
+        self.process.start()
+        child_end.close()
+        self._lock = threading.Lock()
+        # Wait until the child has dropped its copies of any held render slots.
+        self.control.recv(1)
+
+    def spawn(self):
+        with self._lock:
+            self.control.sendall(b'!')
+            pid, fds, _, _ = socket.recv_fds(self.control, 4, 1)
+        if not fds:
+            raise OSError('render spawner exited')
+        return _Worker(int.from_bytes(pid, 'little'), Connection(fds[0]))
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.control.close()
+
+
+class _Worker:
+    def __init__(self, pid, conn):
+        self.pid = pid
+        self.conn = conn
+
+    def stop(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.conn.close()
+
+
+class RenderPool:
+    """
+    Fixed set of pre-warmed render processes owned by one web process. They are forked by a spawner
+    process started with the pool, so replacing a worker that timed out or died never forks the
+    (by then threaded) web process.
+    """
+    def __init__(self, workers):
+        warm_up()
+        self._spawner = _Spawner(multiprocessing.get_context('fork'))
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(self._spawner.spawn())
+
+    def render(self, dataset, mode, timeout):
+        """
+        Renders on an idle local worker under a host-wide slot. Neither is waited for: when either
+        is unavailable RenderPoolSaturated is raised at once, so a burst of reports cannot tie up
+        the web process's request threads.
+        """
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            raise RenderPoolSaturated()
+        try:
+            slot = acquire_slot()
+        except BaseException:
+            self._idle.put(worker)
+            raise
+
+        fd, path = tempfile.mkstemp(prefix='report_', suffix='.pdf')
+        os.close(fd)
+        try:
+            worker.conn.send((dataset, mode, path))
+            if not worker.conn.poll(timeout):
+                worker = self._replace(worker)
+                raise RenderTimeout()
+            error = worker.conn.recv()
+        except (EOFError, OSError):
+            worker = self._replace(worker)
+            error = 'render worker exited unexpectedly'
+        except BaseException:
+            os.remove(path)
+            raise
+        finally:
+            release_slot(slot)
+            if worker is not None:
+                self._idle.put(worker)
+
+        if error:
+            os.remove(path)
+            raise RenderFailed(error)
+        return path
+
+    def _replace(self, worker):
+        worker.stop()
+        try:
+            return self._spawner.spawn()
+        except OSError:
+            logger.exception("Could not replace render worker")
+            return None
+
+    def shutdown(self):
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+        self._spawner.stop()
+
+
+_slot_fds = set()
+
+
+def acquire_slot():
+    """
+    Takes one of PDF_RENDER_SLOTS host-wide render slots, shared by every web process through
+    flock()ed files, and returns its descriptor for release_slot(). The kernel also frees the slot
+    if the holder dies. Raises RenderPoolSaturated when all slots are taken.
+    """
+    directory = getattr(settings, 'PDF_RENDER_SLOT_DIR',
+                        os.path.join(tempfile.gettempdir(), 'equipment-visualizer-render-slots'))
+    os.makedirs(directory, exist_ok=True)
+    for index in range(getattr(settings, 'PDF_RENDER_SLOTS', 4)):
+        fd = os.open(os.path.join(directory, f'slot-{index}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        # Registered before locking so a worker forked at any point knows to close it.
+        _slot_fds.add(fd)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            release_slot(fd)
+    raise RenderPoolSaturated()
+
+
+def release_slot(fd):
+    _slot_fds.discard(fd)
+    os.close(fd)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Per-process pool, normally started at worker boot by start() (see gunicorn.conf.py) and
+    otherwise created on first use. Returns None when PDF_RENDER_WORKERS is 0, meaning render inline.
+    """
+    global _pool, _pool_pid
+    workers = getattr(settings, 'PDF_RENDER_WORKERS', 0)
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = RenderPool(workers)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def start():
+    """
+    Warms up and starts the render spawner and its workers. Call before the web process starts
+    serving threads, so its only fork happens while the process is still single-threaded.
+    """
+    get_pool()
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown()
+        _pool = None
+
+
+def render_report(dataset, mode=None):
+    """
+    Returns an open binary file positioned at the start of the report. Raises RenderPoolSaturated
+    when no host-wide slot or local worker is free, RenderTimeout when rendering overruns.
+    """
+    pool = get_pool()
+    if pool is None:
+        if mode == 'detailed':
+            return generate_detailed_pdf_report(dataset)
+        return generate_pdf_report(dataset)
+
+    if mode == 'detailed':
+        timeout = getattr(settings, 'PDF_RENDER_DETAILED_TIMEOUT', 300)
+    else:
+        timeout = getattr(settings, 'PDF_RENDER_TIMEOUT', 60)
+    path = pool.render(dataset, mode, timeout)
+    report = open(path, 'rb')
+    os.remove(path)
+    return report
@@ -1,8 +1,22 @@
 from rest_framework import serializers
-from .models import UploadedDataset
+from .models import DatasetMetrics, DatasetTypeMetrics, UploadedDataset
 
 class UploadedDatasetSerializer(serializers.ModelSerializer):
     class Meta:
         model = UploadedDataset
-        fields = ['id', 'file', 'uploaded_at', 'summary']
-        read_only_fields = ['summary', 'uploaded_at']
+        fields = ['id', 'file', 'uploaded_at', 'summary', 'quality']
+        read_only_fields = ['summary', 'quality', 'uploaded_at']
+
+
+class DatasetMetricsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DatasetMetrics
+        fields = ['dataset', 'uploaded_at', 'total_count', 'type_count',
+                  'avg_flowrate', 'avg_pressure', 'avg_temperature']
+
+
+class DatasetTypeMetricsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DatasetTypeMetrics
+        fields = ['dataset', 'uploaded_at', 'equipment_type', 'count',
+                  'avg_flowrate', 'avg_pressure', 'avg_temperature']
@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import UploadedDataset
+
+
+@receiver(post_save, sender=UploadedDataset)
+@receiver(post_delete, sender=UploadedDataset)
+def invalidate_dataset_cache(sender, **kwargs):
+    # Wait for the commit so no other worker can rebuild the cache from the old rows.
+    transaction.on_commit(cache.invalidate)
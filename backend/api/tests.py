@@ -1,2 +1,496 @@
-from django.test import TestCase
+import contextlib
+import importlib
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock, skipIf
 
+import pandas as pd
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.apps import apps as django_apps
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import engines, rendering
+from .metrics import summarize, type_metrics
+from .models import DatasetMetrics, DatasetTypeMetrics, UploadedDataset
+from .utils import compute_type_statistics
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_csv(rows, types=('Pump', 'Valve', 'Compressor')):
+    lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+    for i in range(rows):
+        lines.append(f'EQ-{i},{types[i % len(types)]},{100 + i % 7},{4 + i % 3},{90 + i % 11}')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-tests'},
+})
+class DatasetTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['default'].clear()
+
+    def upload(self, content, name='equipment.csv'):
+        return self.client.post('/datasets/', {'file': SimpleUploadedFile(name, content, content_type='text/csv')},
+                                format='multipart')
+
+
+class DetailedReportTests(DatasetTestCase):
+    def test_detailed_pdf_is_multi_page(self):
+        dataset_id = self.upload(make_csv(500)).data['id']
+        response = self.client.get(f'/datasets/{dataset_id}/pdf/', {'mode': 'detailed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('report_%s_detailed.pdf' % dataset_id, response['Content-Disposition'])
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertGreater(content.count(b'/Type /Page\n'), 5)
+
+    @override_settings(PDF_DETAILED_MAX_ROWS=100)
+    def test_detailed_pdf_row_limit(self):
+        dataset_id = self.upload(make_csv(101)).data['id']
+        response = self.client.get(f'/datasets/{dataset_id}/pdf/', {'mode': 'detailed'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limited to 100 rows', response.data['error'])
+        self.assertEqual(self.client.get(f'/datasets/{dataset_id}/pdf/').status_code, 200)
+
+    @skipIf(engines.pyarrow is None, 'pyarrow is not installed')
+    def test_chunked_engines_match_read(self):
+        content = make_csv(250).replace(b'EQ-7,Valve,', b'EQ-7,Valve,n/a')
+        expected = engines.PandasEngine().read(io.BytesIO(content))
+        for name in engines.ENGINES:
+            chunks = list(engines.select_engine(name=name).iter_chunks(io.BytesIO(content), 100))
+            combined = pd.concat(chunks, ignore_index=True)
+            self.assertEqual(combined['Flowrate'].tolist(), expected['Flowrate'].tolist())
+            self.assertEqual(combined['Type'].tolist(), expected['Type'].tolist())
+
+    @skipIf(engines.pyarrow is None, 'pyarrow is not installed')
+    def test_pyarrow_chunks_ignore_extra_column_types(self):
+        lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature,Notes']
+        lines += [f'EQ-{i},Pump,{i},5,80,{i}' for i in range(2000)] + ['EQ-X,Valve,1,2,3,hello']
+        engine = engines.PyArrowEngine()
+        engine.block_size = 4096
+        chunks = list(engine.iter_chunks(io.BytesIO(('\n'.join(lines) + '\n').encode()), 500))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 2001)
+        self.assertEqual(chunks[-1]['Type'].iloc[-1], 'Valve')
+
+    def test_type_statistics_match_summary(self):
+        dataset = UploadedDataset.objects.get(id=self.upload(make_csv(300)).data['id'])
+        stats = compute_type_statistics(dataset)
+        self.assertEqual({t: s['count'] for t, s in stats.items()}, dataset.summary['type_distribution'])
+        self.assertEqual(stats['Pump']['min']['Flowrate'], 100)
+        self.assertEqual(stats['Pump']['max']['Flowrate'], 106)
+
+
+class MetricsQueryTests(DatasetTestCase):
+    def test_ingest_writes_metrics(self):
+        dataset_id = self.upload(make_csv(30)).data['id']
+        dataset = UploadedDataset.objects.get(id=dataset_id)
+        self.assertEqual(dataset.metrics.total_count, 30)
+        self.assertEqual(dataset.metrics.type_count, 3)
+        pump = dataset.type_metrics.get(equipment_type='Pump')
+        self.assertEqual(pump.count, 10)
+
+    def test_query_filters_and_orders_by_type_average(self):
+        low = self.upload(make_csv(9)).data['id']
+        high = self.upload(b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP1,Pump,10,8,50\nV1,Valve,5,1,20\n').data['id']
+
+        response = self.client.get('/datasets/query/', {'type': 'Pump', 'min_avg_pressure': 5})
+        self.assertEqual([row['dataset'] for row in response.data], [high])
+
+        response = self.client.get('/datasets/query/', {'type': 'Pump', 'ordering': 'avg_pressure'})
+        self.assertEqual([row['dataset'] for row in response.data], [low, high])
+
+        response = self.client.get('/datasets/query/', {'min_total_count': 5, 'uploaded_after': '2000-01-01'})
+        self.assertEqual([row['dataset'] for row in response.data], [low])
+
+    def test_backfill_migration_runs_in_batches(self):
+        backfill = importlib.import_module('api.migrations.0003_backfill_dataset_metrics').backfill
+        ids = [self.upload(make_csv(6)).data['id'] for _ in range(3)]
+        orphan = UploadedDataset.objects.create(
+            file='datasets/missing.csv',
+            summary={'total_count': 2, 'averages': {'Flowrate': 1}, 'type_distribution': {'Pump': 2}},
+        )
+        DatasetMetrics.objects.all().delete()
+        DatasetTypeMetrics.objects.all().delete()
+
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            backfill(django_apps, None, batch_size=2)
+        self.assertIn(f'Could not re-read dataset {orphan.pk}', out.getvalue())
+
+        self.assertEqual(DatasetMetrics.objects.count(), 4)
+        for dataset_id in ids:
+            pump = DatasetTypeMetrics.objects.get(dataset_id=dataset_id, equipment_type='Pump')
+            self.assertEqual((pump.count, pump.avg_flowrate), (2, 101.5))
+        orphan_pump = DatasetTypeMetrics.objects.get(dataset=orphan)
+        self.assertEqual((orphan_pump.count, orphan_pump.avg_flowrate), (2, None))
+
+    def test_query_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/datasets/query/', {'ordering': 'file'}).status_code, 400)
+        self.assertEqual(self.client.get('/datasets/query/', {'min_avg_pressure': 'x'}).status_code, 400)
+
+
+class ParseEngineTests(TestCase):
+    MESSY_CSV = (
+        b'Equipment Name , Type,Flowrate, Pressure ,Temperature,Notes\n'
+        b'P-1,Pump,120.5,5.2,80,ok\n'
+        b'P-2,Pump,n/a,6,,\n'
+        b'V-1,Valve,40, 2.5,110,"quoted, note"\n'
+        b'C-1,,90,7.1,150,\n'
+        b'C-2,Compressor,95,7.3,abc,x\n'
+    )
+
+    @skipIf(engines.pyarrow is None, 'pyarrow is not installed')
+    def test_engines_produce_identical_summaries(self):
+        results = {}
+        for name in engines.ENGINES:
+            df = engines.select_engine(name=name).read(io.BytesIO(self.MESSY_CSV))
+            results[name] = (summarize(df), type_metrics(df))
+        self.assertEqual(results['pandas'], results['pyarrow'])
+        self.assertEqual(results['pandas'][0]['total_count'], 5)
+
+    @skipIf(engines.pyarrow is None, 'pyarrow is not installed')
+    def test_typed_fast_path_matches_pandas(self):
+        content = make_csv(2000)
+        pandas_df = engines.PandasEngine().read(io.BytesIO(content))
+        arrow_df = engines.PyArrowEngine().read(io.BytesIO(content))
+        self.assertEqual(summarize(pandas_df), summarize(arrow_df))
+
+    def test_selection(self):
+        with override_settings(CSV_PARSE_ENGINE='pandas'):
+            self.assertEqual(engines.select_engine(size=10 ** 10).name, 'pandas')
+        with override_settings(CSV_PARSE_ENGINE='auto', CSV_PYARROW_MIN_BYTES=1000):
+            self.assertEqual(engines.select_engine(size=10).name, 'pandas')
+        with self.assertRaises(ValueError):
+            engines.select_engine(name='polars')
+
+
+class ResponseCacheTests(DatasetTestCase):
+    def upload_and_commit(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.upload(content).data['id']
+
+    def test_list_is_cached_until_upload(self):
+        first = self.upload_and_commit(make_csv(3))
+        self.assertEqual(self.client.get('/datasets/')['X-Cache'], 'MISS')
+        response = self.client.get('/datasets/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual([d['id'] for d in response.data], [first])
+
+        second = self.upload_and_commit(make_csv(3))
+        response = self.client.get('/datasets/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([d['id'] for d in response.data], [second, first])
+
+        stats = self.client.get('/datasets/cache-stats/').data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_counters_do_not_expire_on_file_backend(self):
+        location = os.path.join(MEDIA_ROOT, 'file-cache')
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}):
+            for _ in range(3):
+                self.client.get('/datasets/')
+            with mock.patch('django.core.cache.backends.filebased.time.time', return_value=time.time() + 3600):
+                stats = self.client.get('/datasets/cache-stats/').data
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_retention_pruning_invalidates_detail(self):
+        oldest = self.upload_and_commit(make_csv(3))
+        self.assertEqual(self.client.get(f'/datasets/{oldest}/').status_code, 200)
+        self.assertEqual(self.client.get(f'/datasets/{oldest}/')['X-Cache'], 'HIT')
+        for _ in range(5):
+            self.upload_and_commit(make_csv(3))
+        self.assertEqual(self.client.get(f'/datasets/{oldest}/').status_code, 404)
+
+    def test_delete_invalidates_list(self):
+        dataset_id = self.upload_and_commit(make_csv(3))
+        self.client.get('/datasets/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/datasets/{dataset_id}/')
+        self.assertEqual(self.client.get('/datasets/').data, [])
+
+
+class ResummarizeCommandTests(DatasetTestCase):
+    def test_outdated_summaries_are_recomputed(self):
+        current = UploadedDataset.objects.get(id=self.upload(make_csv(6)).data['id'])
+        stale = UploadedDataset.objects.get(id=self.upload(make_csv(9)).data['id'])
+        expected = stale.summary
+        UploadedDataset.objects.filter(id=stale.id).update(summary={'total_count': 1})
+        DatasetTypeMetrics.objects.filter(dataset=stale).delete()
+
+        out = io.StringIO()
+        call_command('resummarize', outdated=True, workers=1, dry_run=True, stdout=out)
+        self.assertIn('Would update 1 of 1', out.getvalue())
+        self.assertEqual(UploadedDataset.objects.get(id=stale.id).summary, {'total_count': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('resummarize', outdated=True, workers=1, stdout=io.StringIO())
+        stale.refresh_from_db()
+        self.assertEqual(stale.summary, expected)
+        self.assertEqual(stale.type_metrics.count(), 3)
+        self.assertEqual(UploadedDataset.objects.get(id=current.id).summary, current.summary)
+
+    def test_checkpoint_skips_committed_ids(self):
+        first = self.upload(make_csv(3)).data['id']
+        second = self.upload(make_csv(3)).data['id']
+        UploadedDataset.objects.update(summary={'total_count': 0})
+        checkpoint = os.path.join(MEDIA_ROOT, 'resummarize.checkpoint')
+        with open(checkpoint, 'w') as f:
+            f.write(str(first))
+
+        call_command('resummarize', workers=1, checkpoint=checkpoint, stdout=io.StringIO())
+        self.assertEqual(UploadedDataset.objects.get(id=first).summary, {'total_count': 0})
+        self.assertEqual(UploadedDataset.objects.get(id=second).summary['total_count'], 3)
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_failures_are_listed_and_hold_the_checkpoint(self):
+        first = self.upload(make_csv(3)).data['id']
+        broken = self.upload(make_csv(3)).data['id']
+        last = self.upload(make_csv(3)).data['id']
+        UploadedDataset.objects.update(summary={'total_count': 0})
+        os.remove(UploadedDataset.objects.get(id=broken).file.path)
+        checkpoint = os.path.join(MEDIA_ROOT, 'failures.checkpoint')
+
+        out = io.StringIO()
+        call_command('resummarize', workers=1, batch_size=10, checkpoint=checkpoint,
+                     stdout=out, stderr=io.StringIO())
+        self.assertIn(f'Failed datasets (re-run with --ids): {broken}', out.getvalue())
+        self.assertEqual(UploadedDataset.objects.get(id=last).summary['total_count'], 3)
+        with open(checkpoint) as f:
+            self.assertEqual(int(f.read()), first)
+
+    def test_missing_columns_are_recorded_not_failed(self):
+        invalid = self.upload(b'Equipment Name,Type,Flowrate\nP-1,Pump,3\n').data['id']
+        UploadedDataset.objects.filter(id=invalid).update(quality=None)
+        checkpoint = os.path.join(MEDIA_ROOT, 'invalid.checkpoint')
+
+        for _ in range(2):
+            out = io.StringIO()
+            call_command('resummarize', outdated=True, workers=1, checkpoint=checkpoint, stdout=out)
+            self.assertIn('(0 failed)', out.getvalue())
+            self.assertFalse(os.path.exists(checkpoint))
+        self.assertEqual(UploadedDataset.objects.get(id=invalid).quality,
+                         {'missing_columns': ['Pressure', 'Temperature']})
+
+
+class AppendTests(DatasetTestCase):
+    def append(self, dataset_id, content):
+        return self.client.post(f'/datasets/{dataset_id}/append/',
+                                {'file': SimpleUploadedFile('delta.csv', content, content_type='text/csv')},
+                                format='multipart')
+
+    def test_append_matches_full_upload(self):
+        full = make_csv(40)
+        head, tail = full.split(b'\n')[:31], full.split(b'\n')[31:]
+        dataset_id = self.upload(b'\n'.join(head)).data['id']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.append(dataset_id, b'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + b'\n'.join(tail))
+        self.assertEqual(response.status_code, 200)
+
+        expected = UploadedDataset.objects.get(id=self.upload(full).data['id'])
+        appended = UploadedDataset.objects.get(id=dataset_id)
+        self.assertEqual(appended.summary['total_count'], 40)
+        self.assertEqual(appended.summary['averages'], expected.summary['averages'])
+        self.assertEqual(appended.summary['type_distribution'], expected.summary['type_distribution'])
+        self.assertEqual(appended.metrics.total_count, 40)
+        self.assertEqual(appended.type_metrics.get(equipment_type='Pump').count,
+                         expected.type_metrics.get(equipment_type='Pump').count)
+
+        appended.file.open('rb')
+        self.assertEqual(summarize(engines.PandasEngine().read(appended.file))['averages'],
+                         expected.summary['averages'])
+        appended.file.close()
+
+    def test_append_seeds_legacy_summary_and_invalidates_cache(self):
+        dataset_id = self.upload(make_csv(3)).data['id']
+        UploadedDataset.objects.filter(id=dataset_id).update(summary={'total_count': 3})
+        self.client.get(f'/datasets/{dataset_id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.append(dataset_id, make_csv(2))
+        response = self.client.get(f'/datasets/{dataset_id}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['summary']['total_count'], 5)
+
+    def test_append_profiles_legacy_rows_without_quality(self):
+        dataset_id = self.upload(b'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+                                 b'P1,Pump,abc,2,3\nP2,Pump,1,,3\n').data['id']
+        UploadedDataset.objects.filter(id=dataset_id).update(quality=None)
+        self.append(dataset_id, b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP3,Pump,1,2,3\n')
+
+        report = UploadedDataset.objects.get(id=dataset_id).quality
+        self.assertEqual(report['rows'], 3)
+        self.assertEqual(report['columns']['Flowrate']['coerced'], 1)
+        self.assertEqual(report['columns']['Pressure']['missing'], 1)
+        self.assertTrue(report['incremental'])
+
+    def test_append_keeps_raw_cells(self):
+        dataset_id = self.upload(b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP1,Pump,1,2,3\n').data['id']
+        self.append(dataset_id, b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP2,Pump,n/a,,90\n')
+        self.append(dataset_id, b'Type,Equipment Name,Temperature,Flowrate,Pressure\nValve,V1,7,abc,\n')
+
+        dataset = UploadedDataset.objects.get(id=dataset_id)
+        with open(dataset.file.path) as f:
+            self.assertEqual(f.read(), 'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+                                       'P1,Pump,1,2,3\nP2,Pump,n/a,,90\nV1,Valve,abc,,7\n')
+        self.assertEqual(dataset.summary['total_count'], 3)
+        self.assertEqual(dataset.quality['columns']['Flowrate']['coerced'], 1)
+        self.assertEqual(dataset.quality['columns']['Flowrate']['missing'], 1)
+
+    def test_append_rejects_bad_csv(self):
+        dataset_id = self.upload(make_csv(3)).data['id']
+        self.assertEqual(self.append(dataset_id, b'Name,Kind\nA,B\n').status_code, 400)
+        self.assertEqual(UploadedDataset.objects.get(id=dataset_id).summary['total_count'], 3)
+
+
+@override_settings(PDF_RENDER_SLOT_DIR=os.path.join(MEDIA_ROOT, 'render-slots'))
+class RenderPoolTests(DatasetTestCase):
+    def setUp(self):
+        super().setUp()
+        # Other tests render through a pool built from the default settings.
+        rendering.shutdown()
+
+    def tearDown(self):
+        rendering.shutdown()
+
+    @override_settings(PDF_RENDER_WORKERS=1)
+    def test_pooled_pdf(self):
+        dataset_id = self.upload(make_csv(50)).data['id']
+        for mode in ('summary', 'detailed'):
+            response = self.client.get(f'/datasets/{dataset_id}/pdf/', {'mode': mode})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    @override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_SLOTS=1, PDF_RENDER_RETRY_AFTER=7)
+    def test_slots_are_shared_across_processes(self):
+        dataset_id = self.upload(make_csv(5)).data['id']
+        ctx = multiprocessing.get_context('fork')
+        holding, release = ctx.Event(), ctx.Event()
+
+        def hold_slot():
+            slot = rendering.acquire_slot()
+            holding.set()
+            release.wait(10)
+            rendering.release_slot(slot)
+
+        other_web_process = ctx.Process(target=hold_slot)
+        other_web_process.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            response = self.client.get(f'/datasets/{dataset_id}/pdf/')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '7')
+        finally:
+            release.set()
+            other_web_process.join()
+        self.assertEqual(self.client.get(f'/datasets/{dataset_id}/pdf/').status_code, 200)
+
+    @override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_SLOTS=1)
+    def test_slots_are_exclusive_between_threads(self):
+        dataset = UploadedDataset.objects.get(id=self.upload(make_csv(5)).data['id'])
+        errors = []
+        slot = rendering.acquire_slot()
+        try:
+            def request_thread():
+                try:
+                    rendering.render_report(dataset).close()
+                except rendering.RenderPoolSaturated as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=request_thread)
+            thread.start()
+            thread.join()
+        finally:
+            rendering.release_slot(slot)
+        self.assertEqual(len(errors), 1)
+        rendering.render_report(dataset).close()
+
+    @override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_SLOTS=4, PDF_RENDER_TIMEOUT=60)
+    def test_busy_renderers_answer_at_once_and_leave_other_requests_alone(self):
+        dataset_id = self.upload(make_csv(5)).data['id']
+        pool = rendering.get_pool()
+        busy = pool._idle.get_nowait()
+        try:
+            started = time.monotonic()
+            self.assertEqual(self.client.get(f'/datasets/{dataset_id}/pdf/').status_code, 503)
+            self.assertLess(time.monotonic() - started, 5)
+            self.assertEqual(self.client.get('/datasets/').status_code, 200)
+        finally:
+            pool._idle.put(busy)
+        # The failed attempt must not have kept a host-wide slot.
+        slots = [rendering.acquire_slot() for _ in range(4)]
+        for slot in slots:
+            rendering.release_slot(slot)
+
+    @override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_TIMEOUT=0.001)
+    def test_timeout_kills_and_replaces_worker(self):
+        dataset_id = self.upload(make_csv(5)).data['id']
+        pool = rendering.get_pool()
+        stuck = pool._idle.queue[0]
+        self.assertEqual(self.client.get(f'/datasets/{dataset_id}/pdf/').status_code, 504)
+        replacement = pool._idle.queue[0]
+        self.assertIsNot(replacement, stuck)
+        self.assertNotIn(replacement.pid, (stuck.pid, os.getpid()))
+        self.assertTrue(stuck.conn.closed)
+        with override_settings(PDF_RENDER_TIMEOUT=60):
+            self.assertEqual(self.client.get(f'/datasets/{dataset_id}/pdf/').status_code, 200)
+
+
+class QualityReportTests(DatasetTestCase):
+    def test_profile_counts_coercions_outliers_and_duplicates(self):
+        lines = ['Equipment Name,Type,Flowrate,Pressure,Temperature']
+        lines += [f'P-{i},Pump,{100 + i % 5},5,80' for i in range(20)]
+        lines += ['P-0,Pump,900,5,80', 'V-1,Valve,abc,-2,', 'V-2,Valve,,3,-300', 'X-1,,10,1,1']
+        dataset = UploadedDataset.objects.get(id=self.upload(('\n'.join(lines) + '\n').encode()).data['id'])
+        report = dataset.quality
+
+        self.assertEqual(report['rows'], 24)
+        self.assertEqual(report['columns']['Flowrate']['coerced'], 1)
+        self.assertEqual(report['columns']['Flowrate']['missing'], 1)
+        self.assertEqual(report['columns']['Temperature']['missing'], 1)
+        self.assertEqual(report['columns']['Pressure']['out_of_range'], 1)
+        self.assertEqual(report['columns']['Temperature']['out_of_range'], 1)
+        self.assertEqual(report['columns']['Flowrate']['iqr_outliers'], 1)
+        self.assertEqual(report['columns']['Flowrate']['zscore_outliers'], 1)
+        self.assertEqual(report['outliers_by_type'], {'Pump': {'Flowrate': 1}})
+        self.assertEqual(report['missing_type'], 1)
+        self.assertEqual(report['duplicate_names'], {'rows': 2, 'examples': ['P-0']})
+        self.assertEqual(dataset.summary['total_count'], 24)
+
+    @override_settings(DATA_QUALITY_THRESHOLDS={'ranges': {'Flowrate': [0, 103]}})
+    def test_thresholds_are_configurable(self):
+        dataset = UploadedDataset.objects.get(id=self.upload(make_csv(21)).data['id'])
+        self.assertEqual(dataset.quality['columns']['Flowrate']['out_of_range'], 9)
+        self.assertEqual(dataset.quality['columns']['Pressure']['out_of_range'], 0)
+
+    def test_missing_columns_are_recorded(self):
+        response = self.upload(b'Equipment Name,Type,Flowrate\nP-1,Pump,3\n')
+        dataset = UploadedDataset.objects.get(id=response.data['id'])
+        self.assertIsNone(dataset.summary)
+        self.assertEqual(dataset.quality, {'missing_columns': ['Pressure', 'Temperature']})
+
+    def test_parse_errors_are_recorded(self):
+        content = b'Equipment Name,Type,Flowrate,Pressure,Temperature\nP-1,Pump,1,2,3\nP-2,Pump,1,2,3,4,5\n'
+        with self.assertLogs('api.models', level='WARNING'):
+            response = self.upload(content)
+        dataset = UploadedDataset.objects.get(id=response.data['id'])
+        self.assertIsNone(dataset.summary)
+        self.assertIn('Expected 5 fields', dataset.quality['parse_error'])
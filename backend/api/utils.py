@@ -1,11 +1,19 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle,
+)
 import io
+import tempfile
 import matplotlib
+import numpy as np
 import matplotlib.pyplot as plt
 
+from .engines import NUMERIC_COLUMNS, REQUIRED_COLUMNS, select_engine
+
 matplotlib.use('Agg')
 
 def generate_chart(summary):
@@ -46,8 +54,8 @@ def draw_header(c, width, height, dataset_id, date):
     c.setFont("Helvetica", 12)
     c.drawString(30, height - 70, f"Dataset ID: #{dataset_id}  |  Generated: {date.strftime('%Y-%m-%d %H:%M')}")
 
-def generate_pdf_report(dataset_instance):
-    buffer = io.BytesIO()
+def generate_pdf_report(dataset_instance, output=None):
+    buffer = output if output is not None else io.BytesIO()
     c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
     summary = dataset_instance.summary
@@ -137,3 +145,185 @@ def generate_pdf_report(dataset_instance):
     c.save()
     buffer.seek(0)
     return buffer
+
+
+ROWS_PER_TABLE = 45
+CSV_CHUNK_SIZE = 50_000
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class _FlowableStream(list):
+    """
+    List-like story that pulls flowables from a generator only when platypus asks for them,
+    so the full story never exists in memory at once.
+    """
+    def __init__(self, source, lookahead=8):
+        super().__init__()
+        self._source = iter(source)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def iter_dataset_chunks(dataset_instance, chunksize=CSV_CHUNK_SIZE):
+    """
+    Yields the dataset's rows as cleaned DataFrame chunks, parsed by the same engine as ingestion.
+    """
+    dataset_instance.file.open('rb')
+    try:
+        engine = select_engine(size=dataset_instance.file.size)
+        for chunk in engine.iter_chunks(dataset_instance.file, chunksize):
+            yield chunk[REQUIRED_COLUMNS]
+    finally:
+        dataset_instance.file.close()
+
+
+def compute_type_statistics(dataset_instance):
+    """
+    Single chunked pass producing count/min/max/mean per Type for each numeric column.
+    """
+    counts = sums = mins = maxs = None
+    for chunk in iter_dataset_chunks(dataset_instance):
+        grouped = chunk.groupby('Type')[NUMERIC_COLUMNS]
+        if counts is None:
+            counts, sums, mins, maxs = grouped.size(), grouped.sum(), grouped.min(), grouped.max()
+            continue
+        counts = counts.add(grouped.size(), fill_value=0)
+        sums = sums.add(grouped.sum(), fill_value=0)
+        mins = mins.combine(grouped.min(), np.fmin)
+        maxs = maxs.combine(grouped.max(), np.fmax)
+    if counts is None:
+        return {}
+
+    stats = {}
+    for type_name, count in counts.items():
+        count = int(count)
+        stats[str(type_name)] = {
+            'count': count,
+            'min': {col: round(float(mins.at[type_name, col]), 2) for col in NUMERIC_COLUMNS},
+            'max': {col: round(float(maxs.at[type_name, col]), 2) for col in NUMERIC_COLUMNS},
+            'mean': {col: round(float(sums.at[type_name, col]) / count, 2) for col in NUMERIC_COLUMNS},
+        }
+    return stats
+
+
+def generate_type_chart(type_name, type_stats):
+    """
+    Generates a min/avg/max bar chart of the numeric parameters for one equipment type.
+    """
+    buffer = io.BytesIO()
+    x = range(len(NUMERIC_COLUMNS))
+    width = 0.25
+    fig, ax = plt.subplots(figsize=(6, 3))
+    for offset, (key, label, color) in enumerate([
+        ('min', 'Min', '#95A5A6'),
+        ('mean', 'Average', '#4F81BD'),
+        ('max', 'Max', '#2C3E50'),
+    ]):
+        values = [type_stats[key][col] for col in NUMERIC_COLUMNS]
+        ax.bar([i + (offset - 1) * width for i in x], values, width, label=label, color=color)
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(NUMERIC_COLUMNS)
+    ax.set_title(f'{type_name} Parameter Range', fontsize=12, fontweight='bold')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(buffer, format='png', dpi=100)
+    plt.close(fig)
+
+    buffer.seek(0)
+    return buffer
+
+
+def _styled_table(data, col_widths, repeat_rows=1, font_size=None):
+    t = Table(data, colWidths=col_widths, repeatRows=repeat_rows)
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#34495E")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor("#ECF0F1")),
+        ('GRID', (0, 0), (-1, -1), 1, colors.white),
+    ]
+    if font_size:
+        style += [
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ]
+    t.setStyle(TableStyle(style))
+    return t
+
+
+def _detailed_story(dataset_instance, type_stats):
+    styles = getSampleStyleSheet()
+    summary = dataset_instance.summary
+    avgs = summary.get('averages', {})
+
+    yield Paragraph(f"Detailed Equipment Report - Dataset #{dataset_instance.id}", styles['Title'])
+    yield Paragraph(f"Generated from upload at {dataset_instance.uploaded_at.strftime('%Y-%m-%d %H:%M')}",
+                    styles['Normal'])
+    yield Spacer(1, 12)
+
+    yield Paragraph("1. Executive Summary", styles['Heading2'])
+    overview = [['Metric', 'Value']]
+    overview.append(['Total Records', str(summary.get('total_count', 0))])
+    overview.append(['Equipment Types', str(len(type_stats))])
+    for col in NUMERIC_COLUMNS:
+        overview.append([f'Avg {col}', f"{avgs.get(col, 0)}"])
+    yield _styled_table(overview, [200, 150])
+    yield Spacer(1, 12)
+    yield Image(generate_chart(summary), width=5 * inch, height=3.33 * inch)
+
+    yield PageBreak()
+    yield Paragraph("2. Per-Type Analysis", styles['Heading2'])
+    for type_name, stats in sorted(type_stats.items()):
+        yield Paragraph(f"{type_name} ({stats['count']} units)", styles['Heading3'])
+        rows = [['Parameter', 'Min', 'Average', 'Max']]
+        for col in NUMERIC_COLUMNS:
+            rows.append([col, stats['min'][col], stats['mean'][col], stats['max'][col]])
+        yield _styled_table(rows, [150, 100, 100, 100])
+        yield Spacer(1, 6)
+        yield Image(generate_type_chart(type_name, stats), width=5 * inch, height=2.5 * inch)
+        yield Spacer(1, 12)
+
+    yield PageBreak()
+    yield Paragraph("3. Equipment Records", styles['Heading2'])
+    header = REQUIRED_COLUMNS
+    col_widths = [170, 100, 80, 80, 80]
+    for chunk in iter_dataset_chunks(dataset_instance):
+        records = chunk.astype({col: str for col in REQUIRED_COLUMNS}).values.tolist()
+        for start in range(0, len(records), ROWS_PER_TABLE):
+            yield _styled_table([header] + records[start:start + ROWS_PER_TABLE], col_widths, font_size=8)
+
+
+def generate_detailed_pdf_report(dataset_instance, output=None):
+    """
+    Builds a multi-page report with per-type sections and the full record listing.
+    The CSV is read in chunks and the story is generated lazily. Unless an output file is given, the
+    PDF is written to a spooled temporary file that only rolls over to disk past SPOOL_MAX_SIZE.
+    """
+    type_stats = compute_type_statistics(dataset_instance)
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    doc = SimpleDocTemplate(
+        output, pagesize=letter,
+        leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30,
+        title=f"Dataset #{dataset_instance.id} Detailed Report",
+    )
+    doc.build(_FlowableStream(_detailed_story(dataset_instance, type_stats)))
+    output.seek(0)
+    return output
@@ -1,16 +1,52 @@
+from datetime import datetime
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.http import FileResponse
-from .models import UploadedDataset
-from .serializers import UploadedDatasetSerializer
-from .utils import generate_pdf_report
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from . import cache, rendering
+from .models import DatasetMetrics, DatasetTypeMetrics, UploadedDataset
+from .serializers import DatasetMetricsSerializer, DatasetTypeMetricsSerializer, UploadedDatasetSerializer
+
+METRIC_FIELDS = ['avg_flowrate', 'avg_pressure', 'avg_temperature']
+QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+
+
+def _parse_bound(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(date, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
 
 class DatasetViewSet(viewsets.ModelViewSet):
     queryset = UploadedDataset.objects.all().order_by('-uploaded_at')
     serializer_class = UploadedDatasetSerializer
 
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(DatasetViewSet, self).list(request, *args, **kwargs).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, lambda: super(DatasetViewSet, self).retrieve(request, *args, **kwargs).data)
+
+    def _cached(self, request, build):
+        data, hit = cache.get_or_build(request, build)
+        return Response(data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        return Response(cache.stats())
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -26,6 +62,71 @@ class DatasetViewSet(viewsets.ModelViewSet):
         dataset = self.get_object()
         if not dataset.summary:
             return Response({"error": "No summary available for this dataset"}, status=400)
-            
-        pdf_buffer = generate_pdf_report(dataset)
-        return FileResponse(pdf_buffer, as_attachment=True, filename=f'report_{pk}.pdf')
+
+        mode = request.query_params.get('mode')
+        max_rows = getattr(settings, 'PDF_DETAILED_MAX_ROWS', 100_000)
+        if mode == 'detailed' and dataset.summary.get('total_count', 0) > max_rows:
+            return Response({"error": f"Detailed reports are limited to {max_rows} rows; "
+                                      f"this dataset has {dataset.summary['total_count']}"}, status=400)
+        retry_after = {'Retry-After': str(getattr(settings, 'PDF_RENDER_RETRY_AFTER', 5))}
+        try:
+            pdf_buffer = rendering.render_report(dataset, mode)
+        except rendering.RenderPoolSaturated:
+            return Response({"error": "Report renderer is busy, please retry"}, status=503, headers=retry_after)
+        except rendering.RenderTimeout:
+            return Response({"error": "Report rendering timed out"}, status=504, headers=retry_after)
+        except rendering.RenderFailed as e:
+            return Response({"error": f"Report rendering failed: {e}"}, status=500)
+
+        filename = f'report_{pk}_detailed.pdf' if mode == 'detailed' else f'report_{pk}.pdf'
+        return FileResponse(pdf_buffer, as_attachment=True, filename=filename)
+
+    @action(detail=True, methods=['post'])
+    def append(self, request, pk=None):
+        dataset = self.get_object()
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "No file uploaded"}, status=400)
+        try:
+            dataset.append(upload, size=upload.size)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        return Response(self.get_serializer(dataset).data)
+
+    @action(detail=False, methods=['get'])
+    def query(self, request):
+        """
+        Filters datasets on their denormalised metrics. With `type`, rows are per (dataset, Type);
+        otherwise per dataset. Numeric filters take `min_<field>` / `max_<field>`.
+        """
+        params = request.query_params
+        equipment_type = params.get('type')
+        if equipment_type:
+            queryset = DatasetTypeMetrics.objects.filter(equipment_type=equipment_type)
+            serializer_class = DatasetTypeMetricsSerializer
+            numeric_fields = METRIC_FIELDS + ['count']
+        else:
+            queryset = DatasetMetrics.objects.all()
+            serializer_class = DatasetMetricsSerializer
+            numeric_fields = METRIC_FIELDS + ['total_count', 'type_count']
+
+        try:
+            for field in numeric_fields:
+                if f'min_{field}' in params:
+                    queryset = queryset.filter(**{f'{field}__gte': float(params[f'min_{field}'])})
+                if f'max_{field}' in params:
+                    queryset = queryset.filter(**{f'{field}__lte': float(params[f'max_{field}'])})
+            if 'uploaded_after' in params:
+                queryset = queryset.filter(uploaded_at__gte=_parse_bound(params['uploaded_after']))
+            if 'uploaded_before' in params:
+                queryset = queryset.filter(uploaded_at__lte=_parse_bound(params['uploaded_before']))
+            limit = min(int(params.get('limit', QUERY_LIMIT)), MAX_QUERY_LIMIT)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        ordering = params.get('ordering', '-uploaded_at')
+        if ordering.lstrip('-') not in numeric_fields + ['uploaded_at']:
+            return Response({"error": f"Cannot order by '{ordering}'"}, status=400)
+
+        queryset = queryset.order_by(ordering, '-dataset_id')[:max(limit, 0)]
+        return Response(serializer_class(queryset, many=True).data)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url
 
@@ -89,3 +90,34 @@ REST_FRAMEWORK = {
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# File-based so cached dataset responses and their invalidation are shared by all gunicorn workers.
+# Defaults to the system temp directory so nothing is written into the source tree.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'equipment-visualizer-cache')),
+    }
+}
+DATASET_CACHE_TIMEOUT = int(os.environ.get('DATASET_CACHE_TIMEOUT', 300))
+
+# CSV ingestion: 'auto', 'pandas' or 'pyarrow'. 'auto' switches to pyarrow for large files on multi-core hosts.
+CSV_PARSE_ENGINE = os.environ.get('CSV_PARSE_ENGINE', 'auto')
+CSV_PYARROW_MIN_BYTES = int(os.environ.get('CSV_PYARROW_MIN_BYTES', 32 * 1024 * 1024))
+
+# PDF reports render in pre-warmed forked processes (per web process; 0 renders inline). Keep
+# PDF_RENDER_WORKERS below GUNICORN_THREADS so reports never occupy every request thread. At most
+# PDF_RENDER_SLOTS reports run host-wide across all gunicorn workers; further requests get a 503.
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', 2))
+PDF_RENDER_SLOTS = int(os.environ.get('PDF_RENDER_SLOTS',
+                                      PDF_RENDER_WORKERS * int(os.environ.get('GUNICORN_WORKERS', 1))))
+PDF_RENDER_SLOT_DIR = os.environ.get('PDF_RENDER_SLOT_DIR',
+                                     os.path.join(tempfile.gettempdir(), 'equipment-visualizer-render-slots'))
+PDF_RENDER_TIMEOUT = float(os.environ.get('PDF_RENDER_TIMEOUT', 60))
+PDF_RENDER_DETAILED_TIMEOUT = float(os.environ.get('PDF_RENDER_DETAILED_TIMEOUT', 300))
+PDF_RENDER_RETRY_AFTER = int(os.environ.get('PDF_RENDER_RETRY_AFTER', 5))
+# ReportLab holds every page until the document is saved, so detailed reports are capped to bound memory.
+PDF_DETAILED_MAX_ROWS = int(os.environ.get('PDF_DETAILED_MAX_ROWS', 100_000))
+
+# Overrides for api.quality.DEFAULT_THRESHOLDS (value ranges, IQR multiplier, z-score cut-off, ...).
+DATA_QUALITY_THRESHOLDS = {}
@@ -0,0 +1,18 @@
+import os
+
+# Report rendering waits on the render pool, so each web process needs threads: with sync workers
+# a waiting download would hold the whole process. See api/rendering.py.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+
+def post_worker_init(worker):
+    # Runs after Django is loaded and before gthread starts its threads, so the render
+    # processes are forked and warmed at boot rather than inside the first PDF request.
+    from django.conf import settings
+    from api import rendering
+    if settings.PDF_RENDER_WORKERS >= worker.cfg.threads:
+        worker.log.warning("PDF_RENDER_WORKERS (%s) should be below the %s request threads, or reports "
+                           "can occupy all of them", settings.PDF_RENDER_WORKERS, worker.cfg.threads)
+    rendering.start()